@@ -1,14 +1,13 @@
-import base64
+import itertools
 import json
-import pickle
 import re
 import sys
 import time
 import uuid
 from pathlib import Path
-from textwrap import dedent
 from typing import Any, List
 
+import orjson
 import requests
 from smolagents.agents import AgentError, AgentLogger
 from smolagents.monitoring import LogLevel
@@ -20,6 +19,34 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from sandbox.configs import SandboxVMConfig
 from sandbox.sandbox import SandboxVMManager
 
+# The final answer is published as display data under this MIME type rather than printed, so it
+# travels on its own IOPub message and stdout chunks never need to be scanned for it. It is JSON
+# (non-JSON values fall back to str(), as in the task summary) so the host never unpickles data
+# produced inside the sandbox. Dict keys JSON cannot hold (e.g. tuples) are stringified first. The
+# kernel's stdlib json writes NaN/Infinity, which orjson rejects, so the host decodes with json too.
+# The wrapper only binds underscore-prefixed helpers and deletes them again, so it cannot clobber
+# names in the agent's namespace.
+_RESULT_MIMETYPE = "application/x-smolagents-result+json"
+# Appended after the agent's code when it calls final_answer(); built once, filled with str.format per call.
+_FINAL_ANSWER_WRAPPER = (
+    "\nimport json as _json\n"
+    "from IPython.display import publish_display_data as _publish\n"
+    "def _jsonable_keys(o):\n"
+    "    if isinstance(o, dict):\n"
+    "        return {{k if k is None or isinstance(k, (str, int, float)) else str(k): _jsonable_keys(v) for k, v in o.items()}}\n"
+    "    if isinstance(o, (list, tuple)):\n"
+    "        return [_jsonable_keys(v) for v in o]\n"
+    "    return o\n"
+    "_result = _jsonable_keys({result_expr})\n"
+    f'_publish({{{{"{_RESULT_MIMETYPE}": _json.dumps(_result, default=str)}}}})\n'
+    "del _json, _publish, _jsonable_keys\n"
+)
+
+_ANSI_ESCAPE_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
+# Code that may change the installed package set; deliberately broad, a false positive only costs a re-listing.
+_PACKAGE_CHANGE_RE = re.compile(r"\b(?:un)?install\b|\buv\s+(?:add|remove)\b")
+
 
 class SandboxExecutor(RemotePythonExecutor):
     def __init__(
@@ -35,6 +62,29 @@ class SandboxExecutor(RemotePythonExecutor):
         self.kernel_id = None
         self.ws = None
         self._exited = False
+        self._package_listing: str | None = None
+        self._http = requests.Session()
+        # One Jupyter session per executor; message ids only need to be unique within it
+        self._session_id = uuid.uuid4().hex
+        self._msg_counter = itertools.count(1)
+        self._execute_request = {
+            "header": {
+                "msg_id": "",
+                "username": "anonymous",
+                "session": self._session_id,
+                "msg_type": "execute_request",
+                "version": "5.0",
+            },
+            "parent_header": {},
+            "metadata": {},
+            "content": {
+                "code": "",
+                "silent": False,
+                "store_history": True,
+                "user_expressions": {},
+                "allow_stdin": False,
+            },
+        }
 
         try:
             self.logger.log("✨ Initializing SandboxExecutor...", level=LogLevel.INFO)
@@ -64,16 +114,16 @@ class SandboxExecutor(RemotePythonExecutor):
         """
         if not traceback_lines:
             return "No traceback information available."
-        ansi_escape_pattern = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-        cleaned_lines = [ansi_escape_pattern.sub("", line) for line in traceback_lines]
+        cleaned_lines = [_ANSI_ESCAPE_RE.sub("", line) for line in traceback_lines]
         return "\n".join(cleaned_lines)
 
     def _initialize_kernel_connection(self, retries: int = 5, delay: float = 5):
         self.logger.log_rule("🧠 Kernel Initialization")
+        debug = self.logger.level >= LogLevel.DEBUG
         self.logger.log("🔗 Fetch existing kernels", level=LogLevel.DEBUG)
         existing_kernels = []
         try:
-            r = requests.get(f"{self.base_url}/api/kernels", timeout=5)
+            r = self._http.get(f"{self.base_url}/api/kernels", timeout=5)
             if r.status_code == 200:
                 existing_kernels = r.json()
                 self.logger.log(f"🔄 Found {len(existing_kernels)} existing kernels", level=LogLevel.INFO)
@@ -86,10 +136,11 @@ class SandboxExecutor(RemotePythonExecutor):
         else:
             for attempt in range(retries):
                 try:
-                    self.logger.log(
-                        f"🆕 Creating new kernel (attempt {attempt + 1}/{retries})...", level=LogLevel.DEBUG
-                    )
-                    r = requests.post(f"{self.base_url}/api/kernels", timeout=5)
+                    if debug:
+                        self.logger.log(
+                            f"🆕 Creating new kernel (attempt {attempt + 1}/{retries})...", level=LogLevel.DEBUG
+                        )
+                    r = self._http.post(f"{self.base_url}/api/kernels", timeout=5)
                     if r.status_code == 201:
                         self.kernel_id = r.json()["id"]
                         self.logger.log(f"✅ Created new kernel: {self.kernel_id}", level=LogLevel.INFO)
@@ -103,17 +154,21 @@ class SandboxExecutor(RemotePythonExecutor):
                 raise RuntimeError("❌ Failed to create a new kernel after retries.")
 
         ws_url = f"{self.ws_url}/api/kernels/{self.kernel_id}/channels"
-        self.logger.log(f"🌐 Connecting WebSocket to: {ws_url}", level=LogLevel.DEBUG)
+        if debug:
+            self.logger.log(f"🌐 Connecting WebSocket to: {ws_url}", level=LogLevel.DEBUG)
         for attempt in range(retries):
             try:
                 # websocket_timeout = getattr(self.vm.config, "websocket_timeout", 120)
-                self.ws = create_connection(ws_url)
+                # Frames are JSON that orjson validates anyway; without wsaccel, websocket-client's own
+                # UTF-8 check runs in pure Python over every frame.
+                self.ws = create_connection(ws_url, skip_utf8_validation=True)
                 self.logger.log("📡 WebSocket connected to kernel.", level=LogLevel.INFO)
                 return
             except Exception as e:
-                self.logger.log(
-                    f"⏳ WebSocket connection failed (attempt {attempt + 1}/{retries}): {e}", level=LogLevel.DEBUG
-                )
+                if debug:
+                    self.logger.log(
+                        f"⏳ WebSocket connection failed (attempt {attempt + 1}/{retries}): {e}", level=LogLevel.DEBUG
+                    )
                 time.sleep(delay)
         raise RuntimeError("❌ Failed to establish WebSocket connection after retries.")
 
@@ -123,22 +178,27 @@ class SandboxExecutor(RemotePythonExecutor):
         self.logger.log(execution_logs)
         return packages
 
+    def list_installed_packages(self) -> str:
+        """Returns ``uv pip list`` output, re-running it only after code that may have changed the packages."""
+        if self._package_listing is None:
+            _, self._package_listing = self.run_code_raise_errors("!uv pip list")
+        return self._package_listing
+
     def run_code_raise_errors(self, code: str, return_final_answer: bool = False) -> tuple[Any, str]:
         """
         Execute code and return result based on whether it's a final answer.
         """
         try:
+            if _PACKAGE_CHANGE_RE.search(code):
+                self._package_listing = None
+
             wrapped_code = code
             if return_final_answer:
                 match = self.final_answer_pattern.search(code)
                 if match:
                     pre_final_answer_code = self.final_answer_pattern.sub("", code)
                     result_expr = match.group(1)
-                    wrapped_code = pre_final_answer_code + dedent(f"""
-                        import pickle, base64
-                        _result = {result_expr}
-                        print("RESULT_PICKLE:" + base64.b64encode(pickle.dumps(_result)).decode())
-                        """)
+                    wrapped_code = pre_final_answer_code + _FINAL_ANSWER_WRAPPER.format(result_expr=result_expr)
 
             msg_id = self._send_execute_request(wrapped_code)
 
@@ -149,8 +209,14 @@ class SandboxExecutor(RemotePythonExecutor):
             result = None
             waiting_for_idle = False
 
+            # Status/stream traffic for other requests on the kernel is discarded; a substring check on the
+            # raw frame skips it without parsing. Our id only appears quoted, in the reply's parent_header.
+            msg_id_token = f'"{msg_id}"'
             while True:
-                msg = json.loads(self.ws.recv())
+                raw = self.ws.recv()
+                if msg_id_token not in raw:
+                    continue
+                msg = orjson.loads(raw)
                 msg_type = msg.get("msg_type", "")
                 parent_msg_id = msg.get("parent_header", {}).get("msg_id")
 
@@ -158,13 +224,12 @@ class SandboxExecutor(RemotePythonExecutor):
                     continue
 
                 if msg_type == "stream":
-                    text = msg["content"]["text"]
-                    if return_final_answer and text.startswith("RESULT_PICKLE:"):
-                        pickle_data = text[len("RESULT_PICKLE:") :].strip()
-                        result = pickle.loads(base64.b64decode(pickle_data))
+                    outputs.append(msg["content"]["text"])
+                elif msg_type == "display_data" and return_final_answer:
+                    payload = msg["content"]["data"].get(_RESULT_MIMETYPE)
+                    if payload is not None:
+                        result = json.loads(payload)
                         waiting_for_idle = True
-                    else:
-                        outputs.append(text)
                 elif msg_type == "error":
                     traceback = msg["content"].get("traceback", [])
                     raise AgentError("\n".join(traceback), self.logger)
@@ -185,30 +250,15 @@ class SandboxExecutor(RemotePythonExecutor):
             raise ConnectionError("Cannot send request: WebSocket connection is not active.")
 
         # Generate a unique message ID
-        msg_id = str(uuid.uuid4())
+        msg_id = f"{self._session_id}_{next(self._msg_counter)}"
 
-        # Create execute request
-        execute_request = {
-            "header": {
-                "msg_id": msg_id,
-                "username": "anonymous",
-                "session": str(uuid.uuid4()),
-                "msg_type": "execute_request",
-                "version": "5.0",
-            },
-            "parent_header": {},
-            "metadata": {},
-            "content": {
-                "code": code,
-                "silent": False,
-                "store_history": True,
-                "user_expressions": {},
-                "allow_stdin": False,
-            },
-        }
+        # Fill in the per-request fields of the template; it is serialized right away, so reuse is safe
+        execute_request = self._execute_request
+        execute_request["header"]["msg_id"] = msg_id
+        execute_request["content"]["code"] = code
 
         # Pylance now knows self.ws is not None at this point
-        self.ws.send(json.dumps(execute_request))
+        self.ws.send(orjson.dumps(execute_request).decode())
         return msg_id
 
     def cleanup(self):
@@ -217,9 +267,10 @@ class SandboxExecutor(RemotePythonExecutor):
         try:
             self.logger.log("🪩 Cleaning up sandbox resources...", level=LogLevel.INFO)
             if self.kernel_id:
-                requests.delete(f"{self.base_url}/api/kernels/{self.kernel_id}", timeout=5)
+                self._http.delete(f"{self.base_url}/api/kernels/{self.kernel_id}", timeout=5)
             if self.ws:
                 self.ws.close()
+            self._http.close()
             if hasattr(self, "vm"):
                 self.vm.__exit__(None, None, None)
             self.logger.log("✅ Cleanup complete.", level=LogLevel.INFO)
@@ -51,23 +51,21 @@ class CustomColoredFormatter(logging.Formatter):
         logging.CRITICAL: LogColors.BRIGHT_RED,
     }
 
-    THREAD_COLORS = [
+    THREAD_COLORS = (
         LogColors.BRIGHT_BLUE,
         LogColors.BRIGHT_GREEN,
         LogColors.BRIGHT_MAGENTA,
         LogColors.BRIGHT_CYAN,
         LogColors.YELLOW,
-    ]
-    thread_color_map = {}
-    next_thread_color_idx = 0
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._formatters: dict[tuple[str, str], logging.Formatter] = {}
 
     def get_thread_color(self, thread_name):
-        if thread_name not in self.thread_color_map:
-            self.thread_color_map[thread_name] = self.THREAD_COLORS[
-                self.next_thread_color_idx % len(self.THREAD_COLORS)
-            ]
-            self.next_thread_color_idx += 1
-        return self.thread_color_map[thread_name]
+        # Stateless so concurrent handler threads need no shared counter; stable for a thread within a run
+        return self.THREAD_COLORS[hash(thread_name) % len(self.THREAD_COLORS)]
 
     def format(self, record):
         # Determine the color for the log level prefix
@@ -89,16 +87,19 @@ class CustomColoredFormatter(logging.Formatter):
 
         prefix_parts.append(f"[{datetime.fromtimestamp(record.created).strftime(self.DATE_FORMAT)}]")
 
-        dynamic_prefix = " ".join(prefix_parts) + " " if prefix_parts else ""
-
-        # Construct the full log message format string
-        log_fmt = (
-            f"{level_color_start}{dynamic_prefix}%(levelname)s - "
-            f"{thread_color_start}%(threadName)s{LogColors.RESET} - "
-            f"{LogColors.BRIGHT_WHITE}%(message)s{LogColors.RESET}"  # Message is always bright white
-        )
-
-        formatter = logging.Formatter(log_fmt, datefmt=self.DATE_FORMAT)
+        record.log_prefix = " ".join(prefix_parts) + " " if prefix_parts else ""
+
+        # Only the colors vary in the format string; the per-record prefix is passed as a record attribute,
+        # so one Formatter per color pair is built once and reused.
+        key = (level_color_start, thread_color_start)
+        formatter = self._formatters.get(key)
+        if formatter is None:
+            log_fmt = (
+                f"{level_color_start}%(log_prefix)s%(levelname)s - "
+                f"{thread_color_start}%(threadName)s{LogColors.RESET} - "
+                f"{LogColors.BRIGHT_WHITE}%(message)s{LogColors.RESET}"  # Message is always bright white
+            )
+            formatter = self._formatters.setdefault(key, logging.Formatter(log_fmt, datefmt=self.DATE_FORMAT))
         return formatter.format(record)
 
 
@@ -1,3 +1,5 @@
+from collections import deque
+
 from smolagents.agents import CodeAgent
 from smolagents.local_python_executor import PythonExecutor
 
@@ -15,11 +17,15 @@ class SandboxCodeAgent(CodeAgent):
         # The parent __init__ will call `create_python_executor` and set `self.python_executor`
         super().__init__(*args, executor_type=executor_type, executor_kwargs=executor_kwargs, **kwargs)
 
-        # knows that `self.python_executor` is a SandboxExecutor.
-        if isinstance(self.python_executor, SandboxExecutor):
+        # Memory steps still holding screenshots, oldest first; the observation callback evicts from the left.
+        self.recent_image_steps: deque = deque(maxlen=2)
+
+        # Resolved once here; callbacks and task helpers ask for it on every step.
+        self._sandbox_executor = self.python_executor if isinstance(self.python_executor, SandboxExecutor) else None
+        if self._sandbox_executor is not None:
             # Now it's safe to access the .vm attribute
-            self.ssh: SSHClient = self.python_executor.vm.ssh
-            self.sandbox_client: SandboxClient = self.python_executor.vm.sandbox_client
+            self.ssh: SSHClient = self._sandbox_executor.vm.ssh
+            self.sandbox_client: SandboxClient = self._sandbox_executor.vm.sandbox_client
             self.sandbox_client.start_recording()
 
     def create_python_executor(self) -> SandboxExecutor | PythonExecutor:
@@ -34,15 +40,20 @@ class SandboxCodeAgent(CodeAgent):
         # Fallback to original method for "local" executor type
         return super().create_python_executor()
 
+    def get_sandbox_executor(self) -> SandboxExecutor:
+        """Returns the SandboxExecutor, raising a TypeError if the agent runs a different executor."""
+        if self._sandbox_executor is None:
+            msg = "This operation requires an agent with a SandboxExecutor."
+            self.logger.log_error(msg)
+            raise TypeError(msg)
+        return self._sandbox_executor
+
     def cleanup(self):
         """Clean up sandbox or other remote resources if needed."""
         try:
-            # FIX: Use an isinstance check for type safety and to inform Pylance.
-            # This is more robust than hasattr because it checks for the class type.
-            if isinstance(self.python_executor, SandboxExecutor):
-                # Pylance now knows that .cleanup() exists on this object.
+            if self._sandbox_executor is not None:
                 self.sandbox_client.stop_recording()
-                self.python_executor.cleanup()
+                self._sandbox_executor.cleanup()
 
         except Exception as e:
             self.logger.log_error(f"⚠️ CodeAgent cleanup failed: {e}")
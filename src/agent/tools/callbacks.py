@@ -1,5 +1,6 @@
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 
 from PIL import Image
 from smolagents import ActionStep, LogLevel, Timing
@@ -7,14 +8,36 @@ from smolagents import ActionStep, LogLevel, Timing
 from agent.executor import SandboxExecutor
 from agent.sandbox_agent import SandboxCodeAgent
 
+# Screenshots go over HTTP to the observation server while the package listing runs on the
+# Jupyter kernel, so the two can overlap.
+_OBSERVATION_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="observation")
 
-def _get_sandbox_executor(agent: SandboxCodeAgent) -> SandboxExecutor:
-    """Safely gets the SandboxExecutor from an agent, raising a TypeError if it's not the correct type."""
-    if not isinstance(agent.python_executor, SandboxExecutor):
-        msg = "This callback requires an agent with a SandboxExecutor."
-        agent.logger.log_error(msg)
-        raise TypeError(msg)
-    return agent.python_executor
+# Upper bound for screenshots kept in agent memory. The default 1920x1080 desktop fits and is kept
+# pixel-exact, since the agent derives click coordinates from the image; only larger (HiDPI/4K)
+# frames are downscaled. The reported resolution is always the real screen size.
+MAX_OBSERVATION_IMAGE_SIZE = (1920, 1920)
+
+
+def _capture_state(agent: SandboxCodeAgent, executor: SandboxExecutor, step: str) -> Tuple[str, Dict[str, Any]]:
+    """Lists installed packages and takes a screenshot concurrently; returns both results."""
+    screenshot_future = _OBSERVATION_POOL.submit(agent.sandbox_client.take_screenshot, step=step)
+    installed_packages = executor.list_installed_packages()
+    return installed_packages, screenshot_future.result()
+
+
+def _load_screenshot(path: str) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Decodes a screenshot fully into memory and bounds it to MAX_OBSERVATION_IMAGE_SIZE.
+
+    Pillow closes the file itself once a single-frame image is loaded. Returns the image and the
+    original (screen) size.
+    """
+    image = Image.open(path, formats=["PNG"])  # the observation server always writes PNG; skip format sniffing
+    image.load()
+    size = image.size
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail(MAX_OBSERVATION_IMAGE_SIZE)  # in place; no-op when already within bounds
+    return image, size
 
 
 def initial_state_callback(agent: SandboxCodeAgent) -> Optional[ActionStep]:
@@ -24,24 +47,20 @@ def initial_state_callback(agent: SandboxCodeAgent) -> Optional[ActionStep]:
     """
     start_time = time.time()
     try:
-        executor = _get_sandbox_executor(agent)
+        executor = agent.get_sandbox_executor()
         host_shared = executor.vm.cfg.host_container_shared_dir
 
         # Get installed packages and take the initial screenshot
-        packages_result_tuple = executor.run_code_raise_errors("!uv pip list")
-        screenshot_result = agent.sandbox_client.take_screenshot(step="S0")
+        installed_packages, screenshot_result = _capture_state(agent, executor, "S0")
 
         if "screenshot_path" not in screenshot_result:
             agent.logger.log_error("⚠️ Failed to get screenshot path in initial callback.")
             return None
 
         path = str(host_shared / screenshot_result["screenshot_path"])
-        image = Image.open(path)
+        image, _ = _load_screenshot(path)
 
-        # FIX: Access the second element of the tuple for the stdout string.
-        installed_packages_str = (
-            packages_result_tuple[1] if packages_result_tuple else "Could not retrieve package list."
-        )
+        installed_packages_str = installed_packages or "Could not retrieve package list."
 
         # Format the observation text
         observations_text = (
@@ -57,9 +76,10 @@ def initial_state_callback(agent: SandboxCodeAgent) -> Optional[ActionStep]:
             step_number=0,
             model_output="Initial environment state.",
             observations=observations_text,
-            observations_images=[image.copy()],
+            observations_images=[image],
             timing=Timing(start_time=start_time, end_time=time.time()),
         )
+        agent.recent_image_steps.append(initial_step)
         agent.logger.log(f"📸 Saved initial state: {path}", level=LogLevel.DEBUG)
         return initial_step
 
@@ -77,27 +97,24 @@ def observation_screenshot_callback(
     and appends the observation to the current memory step.
     """
     try:
-        executor = _get_sandbox_executor(agent)
+        executor = agent.get_sandbox_executor()
         host_shared = executor.vm.cfg.host_container_shared_dir
         current_step = memory_step.step_number
 
-        # Clean up screenshots from much older steps to save memory
-        for step in agent.memory.steps:
-            if isinstance(step, ActionStep) and step.step_number <= current_step - 2:
-                step.observations_images = None
+        # Clean up screenshots from much older steps to save memory: only the last two steps keep theirs
+        recent = agent.recent_image_steps
+        if len(recent) == recent.maxlen:
+            recent[0].observations_images = None
+        recent.append(memory_step)
 
         # Get installed packages and take the screenshot
-        packages_result_tuple = executor.run_code_raise_errors("!uv pip list")
-        # FIX: Access the second element of the tuple instead of using .get()
-        installed_packages = packages_result_tuple[1] if packages_result_tuple else "Could not retrieve package list."
-
-        screenshot_result = agent.sandbox_client.take_screenshot(step=f"S{current_step}")
+        installed_packages, screenshot_result = _capture_state(agent, executor, f"S{current_step}")
+        installed_packages = installed_packages or "Could not retrieve package list."
 
         if "screenshot_path" in screenshot_result:
             path = str(host_shared / screenshot_result["screenshot_path"])
-            image = Image.open(path)
-            memory_step.observations_images = [image.copy()]
-            width, height = image.size
+            image, (width, height) = _load_screenshot(path)
+            memory_step.observations_images = [image]
 
             # Ensure observations is a string before appending
             if memory_step.observations is None:
@@ -1,11 +1,26 @@
+import logging
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Screenshot resolutions vary between calls; expandable segments let the CUDA caching allocator grow
+# blocks in place instead of fragmenting. Must be set before CUDA is initialised; callers can override.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
 
 import torch
-from gui_actor.inference import inference
+from gui_actor.inference import inference, inference_point_only
 from gui_actor.modeling import Qwen2VLForConditionalGenerationWithPointer
 from PIL import Image, ImageDraw
 from transformers import AutoProcessor
 
+logger = logging.getLogger(__name__)
+
+# Screenshots come in a handful of resolutions, so autotuning the patch-embedding conv per shape pays off
+torch.backends.cudnn.benchmark = True
+
+# Debug prediction images are encoded and written off the inference thread
+PREDICTION_IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images", "prediction")
+_io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gui-actor-io")
+
 # --- GLOBAL MODEL AND PROCESSOR VARIABLES ---
 # These will be loaded once when the script or module is first imported/run
 # and then reused for all subsequent calls.
@@ -15,10 +30,50 @@ data_processor = None
 model_name_or_path = "microsoft/GUI-Actor-7B-Qwen2-VL"
 
 
-def load_gui_actor_model():
+def _save_prediction_image(image: Image.Image, output_filepath: str) -> None:
+    """Writes an annotated prediction image; fast zlib level, since these are throwaway debug artifacts."""
+    os.makedirs(PREDICTION_IMAGE_DIR, exist_ok=True)
+    image.save(output_filepath, "PNG", optimize=False, compress_level=1)
+    logger.debug(f"Image with bounding box and predicted point saved to {output_filepath}")
+
+
+def _log_save_failure(future: Future, output_filepath: str) -> None:
+    """Done-callback for background image saves; nobody waits on the future, so errors are logged here."""
+    exc = future.exception()
+    if exc is not None:
+        logger.error(f"Failed to save prediction image to {output_filepath}: {exc!r}")
+
+
+def _build_conversation(image: Image.Image, instruction: str) -> list:
+    """Builds the grounding conversation for a single screenshot and instruction."""
+    return [
+        {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": "You are a GUI agent. You are given a task and a screenshot of the screen. You need to perform a series of pyautogui actions to complete the task.",
+                }
+            ],
+        },
+        {
+            "role": "user",
+            "content": [{"type": "image", "image": image}, {"type": "text", "text": instruction}],
+        },
+    ]
+
+
+def load_gui_actor_model(compile_model: bool = False, warmup: bool = True):
     """
     Loads the GUI-Actor model, tokenizer, and data processor.
     This function should be called once at the start of your application.
+
+    Args:
+        compile_model (bool, optional): Wrap the language model's forward pass in
+            ``torch.compile(mode="reduce-overhead")``. Off by default: grounding needs no decode phase
+            to capture, and every new screenshot resolution triggers a recompile.
+        warmup (bool, optional): Run one dummy inference after loading so CUDA context setup and kernel
+            selection are paid here instead of on the first agent step.
     """
     global model, tokenizer, data_processor
 
@@ -37,39 +92,69 @@ def load_gui_actor_model():
         print("CUDA is NOT available. Model will run on CPU if device_map is not explicitly set to 'cpu'.")
     print("----------------------------")
 
+    # Only affects fp32 matmuls left over in the bf16 model (e.g. the pointer head); harmless elsewhere
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
+
     print(f"Loading model from: {model_name_or_path}...")
     data_processor = AutoProcessor.from_pretrained(model_name_or_path, use_fast=True)
     tokenizer = data_processor.tokenizer
     model = Qwen2VLForConditionalGenerationWithPointer.from_pretrained(
         model_name_or_path, torch_dtype=torch.bfloat16, device_map="cuda:0", attn_implementation="flash_attention_2"
     ).eval()  # Set to eval mode for inference
+    if compile_model:
+        # The decoder is shared by generate() and the pointer-only path, so compile it rather than model.forward
+        model.model.forward = torch.compile(model.model.forward, mode="reduce-overhead", fullgraph=False, dynamic=False)
 
     # --- Verify Model Device ---
     print(f"Model loaded onto device: {next(model.parameters()).device}")
     print("----------------------------\n")
 
-
-def run_gui_actor_inference(image_path: str, instruction: str, bbox: list = None):
+    if warmup:
+        print("Warming up model...")
+        conversation = _build_conversation(Image.new("RGB", (1120, 1120)), "Click the center of the screen.")
+        with torch.inference_mode():
+            inference_point_only(conversation, model, tokenizer, data_processor, topk=1)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
+
+def run_gui_actor_inference(
+    image_path: str,
+    instruction: str,
+    bbox: list = None,
+    save_debug_image: bool = True,
+    return_text: bool = True,
+):
     """
     Performs inference using the pre-loaded GUI-Actor model and provides detailed output.
 
+    Prediction details are logged at DEBUG level on this module's logger.
+
     Args:
         image_path (str): Path to the input image.
         instruction (str): The instruction for the GUI agent.
         bbox (list, optional): Ground-truth bounding box [x1, y1, x2, y2]. Defaults to [0.0, 0.0, 0.0, 0.0].
+        save_debug_image (bool, optional): Draw the bbox and predicted point onto a copy of the image and
+            save it under images/prediction. Defaults to True.
+        return_text (bool, optional): Go through ``generate`` so ``output_text`` is filled in. Pass False to
+            run only the pointer head, which is all a click prediction needs. Defaults to True.
     Returns:
         dict: A dictionary containing detailed prediction results (output_text, topk_points, etc.).
               Returns None if an error occurs (e.g., image not found).
     """
     if model is None or tokenizer is None or data_processor is None:
-        print("Model not loaded. Please call load_gui_actor_model() first.")
+        logger.error("Model not loaded. Please call load_gui_actor_model() first.")
         return None
 
     # Prepare the image
     try:
-        input_image = Image.open(image_path).convert("RGB")
+        input_image = Image.open(image_path)
+        input_image.load()  # decode now; Pillow closes the file once a single-frame image is loaded
+        if input_image.mode != "RGB":  # desktop screenshots usually are RGB already; skip the copy
+            input_image = input_image.convert("RGB")
     except FileNotFoundError:
-        print(f"Error: Image file not found at {image_path}. Please check the path.")
+        logger.error(f"Image file not found at {image_path}. Please check the path.")
         return None
 
     # Create example dictionary for conversation
@@ -85,49 +170,45 @@ def run_gui_actor_inference(image_path: str, instruction: str, bbox: list = None
         "image": input_image,
     }
 
-    print(f"Instruction: {example['instruction']}")
-    print(f"Ground-truth action region (x1, y1, x2, y2): {[round(i, 2) for i in example['bbox']]}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(f"Instruction: {example['instruction']}")
+        logger.debug(f"Ground-truth action region (x1, y1, x2, y2): {[round(i, 2) for i in example['bbox']]}")
 
-    conversation = [
-        {
-            "role": "system",
-            "content": [
-                {
-                    "type": "text",
-                    "text": "You are a GUI agent. You are given a task and a screenshot of the screen. You need to perform a series of pyautogui actions to complete the task.",
-                }
-            ],
-        },
-        {
-            "role": "user",
-            "content": [{"type": "image", "image": example["image"]}, {"type": "text", "text": example["instruction"]}],
-        },
-    ]
+    conversation = _build_conversation(example["image"], example["instruction"])
 
     # Perform inference
-    pred = inference(conversation, model, tokenizer, data_processor, use_placeholder=True, topk=3)
-
-    # --- Extract and print detailed prediction results ---
-    print("\n--- Prediction Details ---")
-    if pred and pred.get("output_text") is not None:
-        print(f"Generated Text Output: {pred['output_text']}")
-    else:
-        print("Generated Text Output: Not available or None")
-
-    if pred and pred.get("topk_points") is not None:
-        px, py = pred["topk_points"][0]
-        print(f"Predicted Click Point (Normalized): [{round(px, 4)}, {round(py, 4)}]")
-        if len(pred["topk_points"]) > 1:
-            print(f"Top-K Points: {[[round(p[0], 4), round(p[1], 4)] for p in pred['topk_points']]}")
-        if pred.get("topk_values") is not None:
-            print(f"Top-K Values (Scores): {[round(v, 4) for v in pred['topk_values']]}")
-    else:
-        px, py = None, None
-        print("No topk_points found in prediction.")
-
-    if pred and pred.get("n_width") is not None and pred.get("n_height") is not None:
-        print(f"Patch Tokens Dimensions: Width={pred['n_width']}, Height={pred['n_height']}")
-    print("--------------------------\n")
+    with torch.inference_mode():
+        if return_text:
+            pred = inference(conversation, model, tokenizer, data_processor, use_placeholder=True, topk=3)
+        else:
+            pred = inference_point_only(conversation, model, tokenizer, data_processor, topk=3)
+
+    # Both inference paths always return the full dict, with None for anything it could not compute
+    topk_points = pred["topk_points"]
+    px, py = topk_points[0] if topk_points else (None, None)
+
+    # --- Log detailed prediction results ---
+    if debug:
+        output_text = pred["output_text"]
+        logger.debug(f"Generated Text Output: {output_text if output_text is not None else 'Not available or None'}")
+
+        if px is not None:
+            logger.debug(f"Predicted Click Point (Normalized): [{round(px, 4)}, {round(py, 4)}]")
+            if len(topk_points) > 1:
+                logger.debug(f"Top-K Points: {[[round(x, 4), round(y, 4)] for x, y in topk_points]}")
+            topk_values = pred["topk_values"]
+            if topk_values is not None:
+                logger.debug(f"Top-K Values (Scores): {[round(v, 4) for v in topk_values]}")
+        else:
+            logger.debug("No topk_points found in prediction.")
+
+        n_width, n_height = pred["n_width"], pred["n_height"]
+        if n_width is not None and n_height is not None:
+            logger.debug(f"Patch Tokens Dimensions: Width={n_width}, Height={n_height}")
+
+    if not save_debug_image:
+        return pred
 
     # Drawing and checking logic (only proceeds if a predicted point exists)
     if px is not None and py is not None:
@@ -146,26 +227,25 @@ def run_gui_actor_inference(image_path: str, instruction: str, bbox: list = None
         draw.line([(px_pixel, py_pixel - cross_size), (px_pixel, py_pixel + cross_size)], fill="green", width=3)
 
         is_within_bbox = (x1 <= px <= x2) and (y1 <= py <= y2)
-        print(f"Is predicted point within ground-truth bounding box? {is_within_bbox}")
+        logger.debug(f"Is predicted point within ground-truth bounding box? {is_within_bbox}")
 
-        # Save the image
-        output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images", "prediction")
+        # Save the image in the background so the next inference call is not held up by the PNG encode
         output_filename = (
             f"prediction_{os.path.splitext(os.path.basename(image_path))[0]}.png"  # Dynamic filename based on input
         )
-        output_filepath = os.path.join(output_dir, output_filename)
-
-        os.makedirs(output_dir, exist_ok=True)
-        image_for_drawing.save(output_filepath)
-        print(f"Image with bounding box and predicted point saved to {output_filepath}")
+        output_filepath = os.path.join(PREDICTION_IMAGE_DIR, output_filename)
+        future = _io_pool.submit(_save_prediction_image, image_for_drawing, output_filepath)
+        future.add_done_callback(lambda f: _log_save_failure(f, output_filepath))
     else:
-        print("Skipping image drawing and bbox check as no predicted point was found.")
+        logger.debug("Skipping image drawing and bbox check as no predicted point was found.")
 
     return pred  # Return the full prediction dictionary
 
 
 # --- Example Usage ---
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+
     # 1. Load the model once when the script starts (or on application boot)
     load_gui_actor_model()
 
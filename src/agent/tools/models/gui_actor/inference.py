@@ -273,9 +273,16 @@ def inference(conversation, model, tokenizer, data_processor, logits_processor=N
     )  # n_image_tokens, hidden_size
 
     attn_scores, _ = model.multi_patch_pointer_head(image_embeds, decoder_hidden_states)
+    _fill_prediction_points(pred, attn_scores, inputs["image_grid_thw"], model.visual.spatial_merge_size, topk)
+
+    return pred
+
+
+def _fill_prediction_points(pred, attn_scores, image_grid_thw, spatial_merge_size, topk):
+    """Stores the attention scores, patch grid size and top-k region points in ``pred``."""
     pred["attn_scores"] = attn_scores.tolist()
 
-    _, n_height, n_width = (inputs["image_grid_thw"][0] // model.visual.spatial_merge_size).tolist()
+    _, n_height, n_width = (image_grid_thw[0] // spatial_merge_size).tolist()
     pred["n_width"] = n_width
     pred["n_height"] = n_height
 
@@ -290,4 +297,61 @@ def inference(conversation, model, tokenizer, data_processor, logits_processor=N
     pred["topk_values"] = topk_values
     pred["topk_points_all"] = topk_points_all
 
+
+def inference_point_only(conversation, model, tokenizer, data_processor, topk=5):
+    """
+    Pointer-only variant of ``inference(..., use_placeholder=True)``.
+
+    The placeholder assistant turn already contains the pointer tokens, so no token needs to be
+    generated: a single pass through the decoder yields the hidden states the pointer head attends
+    from. Compared to ``inference`` this skips ``generate`` (and with it the LM head over every prompt
+    position), and encodes the screenshot once instead of twice. ``output_text`` is left as None.
+    """
+    pred = {
+        "output_text": None,
+        "n_width": None,
+        "n_height": None,
+        "attn_scores": None,
+        "topk_points": None,
+        "topk_values": None,
+        "topk_points_all": None,
+    }
+
+    # prepare text, with the same placeholder assistant turn as inference(use_placeholder=True)
+    text = data_processor.apply_chat_template(
+        conversation, tokenize=False, add_generation_prompt=False, chat_template=chat_template
+    )
+    text += "<|im_start|>assistant<|recipient|>os\npyautogui.click(<|pointer_start|><|pointer_pad|><|pointer_end|>)"
+
+    # prepare inputs
+    image_inputs, video_inputs = process_vision_info(conversation)
+    inputs = data_processor(text=[text], images=image_inputs, videos=video_inputs, padding=True, return_tensors="pt")
+    inputs = inputs.to(model.device)
+    input_ids = inputs["input_ids"]
+    attention_mask = inputs["attention_mask"]
+
+    pointer_pad_mask = input_ids[0] == model.config.pointer_pad_token_id
+    if not pointer_pad_mask.any():
+        return pred
+
+    # encode the screenshot once; the embeddings feed both the decoder input and the pointer head
+    image_embeds = model.visual(inputs["pixel_values"].type(model.visual.dtype), grid_thw=inputs["image_grid_thw"])
+    inputs_embeds = model.model.embed_tokens(input_ids)
+    image_mask = (input_ids == model.config.image_token_id).unsqueeze(-1).expand_as(inputs_embeds)
+    inputs_embeds = inputs_embeds.masked_scatter(image_mask, image_embeds.to(inputs_embeds.dtype))
+
+    position_ids, _ = model.get_rope_index(input_ids, inputs["image_grid_thw"], None, attention_mask)
+    outputs = model.model(
+        input_ids=None,
+        position_ids=position_ids,
+        attention_mask=attention_mask,
+        inputs_embeds=inputs_embeds,
+        use_cache=False,
+        return_dict=True,
+    )
+    decoder_hidden_states = outputs.last_hidden_state[0][pointer_pad_mask]  # n_pointer_pad_tokens, hidden_size
+
+    attn_scores, _ = model.multi_patch_pointer_head(image_embeds, decoder_hidden_states)
+    _fill_prediction_points(pred, attn_scores, inputs["image_grid_thw"], model.visual.spatial_merge_size, topk)
+
     return pred
@@ -1,7 +1,49 @@
+import operator
+import threading
+from typing import Optional
+
 from fastembed import TextEmbedding
 from qdrant_client import QdrantClient
 from smolagents import Tool
 
+EMBEDDING_MODEL_NAME = "jinaai/jina-embeddings-v2-base-en"
+SNAPSHOT_LOCATION = "https://snapshots.qdrant.io/imdb-1000-jina.snapshot"
+
+_movie_fields = operator.itemgetter("movie_name", "description")
+
+# The embedding model is large; share one instance across all tool instances
+_EMBEDDER: Optional[TextEmbedding] = None
+_EMBEDDER_LOCK = threading.Lock()
+
+# One client per process keeps its HTTP connections alive between tool instances and queries
+_CLIENT: Optional[QdrantClient] = None
+_READY_COLLECTIONS: set[str] = set()
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_embedder() -> TextEmbedding:
+    """Loads the embedding model on first use and returns the shared instance."""
+    global _EMBEDDER
+    if _EMBEDDER is None:
+        with _EMBEDDER_LOCK:
+            if _EMBEDDER is None:
+                _EMBEDDER = TextEmbedding(model_name=EMBEDDING_MODEL_NAME)
+    return _EMBEDDER
+
+
+def _get_client(collection_name: str) -> QdrantClient:
+    """Returns the shared client, recovering *collection_name* from the snapshot the first time it is used."""
+    global _CLIENT
+    if _CLIENT is None or collection_name not in _READY_COLLECTIONS:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = QdrantClient()
+            if collection_name not in _READY_COLLECTIONS:
+                if not _CLIENT.collection_exists(collection_name):
+                    _CLIENT.recover_snapshot(collection_name=collection_name, location=SNAPSHOT_LOCATION)
+                _READY_COLLECTIONS.add(collection_name)
+    return _CLIENT
+
 
 class QdrantQueryTool(Tool):
     name = "qdrant_query"
@@ -17,26 +59,15 @@ class QdrantQueryTool(Tool):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.collection_name = "smolagents"
-        self.client = QdrantClient()
-
-        if not self.client.collection_exists(self.collection_name):
-            self.client.recover_snapshot(
-                collection_name=self.collection_name,
-                location="https://snapshots.qdrant.io/imdb-1000-jina.snapshot",
-            )
-        self.embedder = TextEmbedding(model_name="jinaai/jina-embeddings-v2-base-en")
+        self.client = _get_client(self.collection_name)
+        self.embedder = _get_embedder()
 
     def forward(self, query: str) -> str:
         points = self.client.query_points(
             self.collection_name, query=next(self.embedder.query_embed(query)), limit=5
         ).points
-        docs = "Retrieved documents:\n" + "".join(
-            [
-                f"== Document {str(i)} ==\n"
-                + f"MOVIE TITLE: {point.payload['movie_name']}\n"
-                + f"MOVIE SUMMARY: {point.payload['description']}\n"
-                for i, point in enumerate(points)
-            ]
+        parts = (
+            f"== Document {i} ==\nMOVIE TITLE: {title}\nMOVIE SUMMARY: {summary}\n"
+            for i, (title, summary) in enumerate(map(_movie_fields, (point.payload for point in points)))
         )
-
-        return docs
+        return "".join(("Retrieved documents:\n", *parts))
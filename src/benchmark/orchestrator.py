@@ -1,8 +1,14 @@
-import json
+import asyncio
+import functools
+import itertools
+import queue
+import string
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
+import orjson
 from smolagents import LiteLLMModel, LogLevel
 
 from agent import (
@@ -11,6 +17,7 @@ from agent import (
     observation_screenshot_callback,
 )
 from benchmark.tasks import (
+    BATCHED_CONFIG_FUNCS,
     CONFIG_DISPATCH,
     EVAL_DISPATCH,
     TaskInput,
@@ -20,6 +27,9 @@ from sandbox import SandboxVMConfig
 
 from .utils import Timeout, _get_divider, _save_error_log
 
+# A resolved setup/evaluation step: the dispatch function and its keyword arguments from the task JSON
+BoundStep = Tuple[Callable, Dict[str, Any]]
+
 
 class Orchestrator:
     """
@@ -32,73 +42,215 @@ class Orchestrator:
         tasks_root_dir: Path,
         results_root_dir: Path,
         logger: Any,  # Should be a logging.Logger instance
-        port_config: Dict[str, int],
+        port_config: Union[Dict[str, int], List[Dict[str, int]]],
         agent_prompt_template: str,
         config_dispatch: Dict[str, Callable] = CONFIG_DISPATCH,
         eval_dispatch: Dict[str, Callable] = EVAL_DISPATCH,
         task_timeout: int = 12 * 60,
         max_agent_steps: int = 15,
+        max_parallel_tasks: int = 1,
+        timeout_grace_period: int = 2 * 60,
     ):
         self.model = model
         self.tasks_root_dir = tasks_root_dir
         self.results_root_dir = results_root_dir
         self.logger = logger
-        self.port_config = port_config
+        # Each running task needs its own set of host ports; a task takes a slot for its lifetime.
+        port_configs = [port_config] if isinstance(port_config, dict) else list(port_config)
+        if not port_configs:
+            raise ValueError("At least one port configuration is required.")
+        self.port_slots: "queue.Queue[Dict[str, int]]" = queue.Queue()
+        for ports in port_configs:
+            self.port_slots.put(ports)
+        self.max_parallel_tasks = max(1, min(max_parallel_tasks, len(port_configs)))
         self.config_dispatch = config_dispatch
         self.eval_dispatch = eval_dispatch
         self.agent_prompt_template = agent_prompt_template
+        # The template is fixed for the run, so it is parsed into (literal, field, spec, conversion) parts once
+        self._prompt_parts = list(string.Formatter().parse(agent_prompt_template))
         self.task_timeout = task_timeout
+        self.timeout_grace_period = timeout_grace_period
         self.max_agent_steps = max_agent_steps
+        # Agents of running tasks by (tool, uid), so a timed-out task can be interrupted from the supervisor
+        self._active_agents: Dict[Tuple[str, str], SandboxCodeAgent] = {}
+        # Tasks already reported as timed out while their worker is still running; the worker must not
+        # overwrite the TIMED_OUT summary when it eventually finishes
+        self._timed_out_tasks: Set[Tuple[str, str]] = set()
 
     def run_benchmark(self, task_index_path: Path):
-        """Loads tasks from an index file and runs them sequentially."""
+        """Loads tasks from an index file and runs them, up to ``max_parallel_tasks`` at a time."""
         self.logger.info("Initializing Benchmark Runner...")
         try:
-            with open(task_index_path, "r") as f:
-                task_index = json.load(f)
+            with open(task_index_path, "rb") as f:
+                task_index = orjson.loads(f.read())
             self.logger.info(f"Successfully loaded task index from {task_index_path}")
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
             self.logger.critical(f"Error loading task index file: {e}", exc_info=True)
             return
 
         all_tasks = [(tool, uid) for tool, uids in task_index.items() for uid in uids]
         total_tasks_count = len(all_tasks)
-        self.logger.info(f"Found {total_tasks_count} tasks to run sequentially.")
-
-        for i, (tool, uid) in enumerate(all_tasks):
-            self._run_single_task_with_timeout(i, total_tasks_count, tool, uid)
+        if self.max_parallel_tasks == 1:
+            # On the main thread SIGALRM can abort a task wherever it is blocked, which an interrupt cannot
+            self.logger.info(f"Found {total_tasks_count} tasks to run sequentially.")
+            for i, (tool, uid) in enumerate(all_tasks):
+                self._run_single_task_with_timeout(i, total_tasks_count, tool, uid)
+        else:
+            self.logger.info(f"Found {total_tasks_count} tasks to run, {self.max_parallel_tasks} at a time.")
+            asyncio.run(self._run_benchmark_async(all_tasks))
 
         self.logger.info("\n--- All tasks processed. Benchmark run complete. ---")
 
-    def _run_single_task_with_timeout(self, i: int, total_tasks_count: int, tool: str, uid: str):
-        """Wraps a single task run with a timeout."""
+    async def _run_benchmark_async(self, all_tasks: List[Tuple[str, str]]):
+        """Runs every task in a worker thread, at most ``max_parallel_tasks`` at a time."""
+        total_tasks_count = len(all_tasks)
+        # Gate on a semaphore rather than the pool's queue, so a task's timeout only starts once it runs
+        semaphore = asyncio.Semaphore(self.max_parallel_tasks)
+        pool = ThreadPoolExecutor(max_workers=self.max_parallel_tasks, thread_name_prefix="task")
+        try:
+            await asyncio.gather(
+                *(
+                    self._run_one_async(pool, semaphore, i, total_tasks_count, tool, uid)
+                    for i, (tool, uid) in enumerate(all_tasks)
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            # Don't block on workers that ignored an interrupt; they were already reported
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_one_async(
+        self,
+        pool: ThreadPoolExecutor,
+        semaphore: asyncio.Semaphore,
+        i: int,
+        total_tasks_count: int,
+        tool: str,
+        uid: str,
+    ):
+        """Supervises a single task run, enforcing ``task_timeout``."""
         extra_info = {"task_uid": uid, "task_idx": i, "total_tasks": total_tasks_count}
-        self.logger.info(f"Starting Task {i + 1}/{total_tasks_count}: {uid} (Tool: {tool})", extra=extra_info)
+        await semaphore.acquire()
+        port_config = self.port_slots.get_nowait()
+        self.logger.info(
+            f"Starting Task {i + 1}/{total_tasks_count}: {uid} (Tool: {tool})",
+            extra={**extra_info, "event": "TASK_STARTED"},
+        )
 
-        task_input_result = None
-        try:
-            with Timeout(seconds=self.task_timeout):
-                task_input_result = self._task_worker(i, total_tasks_count, tool, uid)
+        def release_slot():
+            self.port_slots.put(port_config)
+            semaphore.release()
 
-            if task_input_result and task_input_result.output:
-                self.logger.info(
-                    f"✅ Task {uid} ({tool}) finished. Final State: {task_input_result.output.state}, Score: {task_input_result.output.score}",
+        def release_slot_threadsafe(_):
+            self._timed_out_tasks.discard((tool, uid))
+            try:
+                loop.call_soon_threadsafe(release_slot)
+            except RuntimeError:
+                # The event loop is gone, so the run is over; only the port slot still matters
+                self.port_slots.put(port_config)
+
+        loop = asyncio.get_running_loop()
+        worker = pool.submit(self._run_single_task, i, total_tasks_count, tool, uid, port_config)
+        future = asyncio.wrap_future(worker, loop=loop)
+        release_on_exit = True
+        try:
+            # Shielded: a timeout must not cancel the future we keep waiting on below
+            task_input_result = await asyncio.wait_for(asyncio.shield(future), timeout=self.task_timeout)
+            state = task_input_result.output.state if task_input_result and task_input_result.output else None
+            self.logger.info(
+                f"Task {uid} ({tool}) done.", extra={**extra_info, "event": "TASK_COMPLETED", "state": state}
+            )
+        except asyncio.TimeoutError:
+            self.logger.error(
+                f"❌ Task {uid} ({tool}) timed out after {self.task_timeout / 60} minutes.",
+                extra={**extra_info, "event": "TASK_TIMED_OUT"},
+            )
+            # A thread cannot be killed; ask the agent to stop at its next step and give it time to clean up
+            agent = self._active_agents.get((tool, uid))
+            if agent is not None:
+                agent.interrupt()
+            try:
+                task_input_result = await asyncio.wait_for(future, timeout=self.timeout_grace_period)
+            except asyncio.TimeoutError:
+                self.logger.error(
+                    f"❌ Task {uid} ({tool}) did not stop after being interrupted; its ports stay reserved until it exits.",
                     extra=extra_info,
                 )
+                # Its container may still be bound to these ports, so the slot is only handed out again
+                # once the worker thread has actually finished
+                release_on_exit = False
+                self._timed_out_tasks.add((tool, uid))
+                worker.add_done_callback(release_slot_threadsafe)
+                task_input_result = None
+            self._save_timed_out_summary(tool, uid, task_input_result)
+        finally:
+            if release_on_exit:
+                release_slot()
 
-        except TimeoutError as e:
+    def _run_single_task_with_timeout(self, i: int, total_tasks_count: int, tool: str, uid: str):
+        """Runs a single task on the calling thread, enforcing ``task_timeout`` with SIGALRM."""
+        extra_info = {"task_uid": uid, "task_idx": i, "total_tasks": total_tasks_count}
+        port_config = self.port_slots.get()
+        self.logger.info(
+            f"Starting Task {i + 1}/{total_tasks_count}: {uid} (Tool: {tool})",
+            extra={**extra_info, "event": "TASK_STARTED"},
+        )
+
+        task_input_result = None
+        timeout = Timeout(seconds=self.task_timeout)
+        try:
+            with timeout:
+                task_input_result = self._run_single_task(i, total_tasks_count, tool, uid, port_config)
+        except TimeoutError:
+            timeout.timed_out = True
+        finally:
+            self.port_slots.put(port_config)
+
+        if timeout.timed_out:
             self.logger.error(
-                f"❌ Task {uid} ({tool}) timed out after {self.task_timeout / 60} minutes.", extra=extra_info
+                f"❌ Task {uid} ({tool}) timed out after {self.task_timeout / 60} minutes.",
+                extra={**extra_info, "event": "TASK_TIMED_OUT"},
             )
-            task_input_result = TaskInput(
+            self._save_timed_out_summary(tool, uid, task_input_result)
+        else:
+            state = task_input_result.output.state if task_input_result and task_input_result.output else None
+            self.logger.info(
+                f"Task {uid} ({tool}) done.", extra={**extra_info, "event": "TASK_COMPLETED", "state": state}
+            )
+
+    def _save_timed_out_summary(self, tool: str, uid: str, task_input: Optional[TaskInput]):
+        """Marks a task as timed out, keeping whatever results its worker produced."""
+        if task_input is None:
+            task_input = TaskInput(
                 uid=uid,
                 tool=tool,
                 prompt="Task timed out",
                 root_dir=self.tasks_root_dir,
                 results_root_dir=self.results_root_dir,
-                output=TaskOutput(score=0.0, state="TIMED_OUT", eval_error=str(e)),
             )
-            task_input_result.save_result_summary()
+        if not task_input.output:
+            task_input.output = TaskOutput()
+        task_input.output.score = 0.0
+        task_input.output.state = "TIMED_OUT"
+        task_input.output.eval_error = f"Timeout after {self.task_timeout} seconds"
+        task_input.save_result_summary()
+
+    def _run_single_task(
+        self, i: int, total_tasks_count: int, tool: str, uid: str, port_config: Dict[str, int]
+    ) -> Optional[TaskInput]:
+        """Runs a single task in a worker thread, turning unexpected failures into an error summary."""
+        extra_info = {"task_uid": uid, "task_idx": i, "total_tasks": total_tasks_count}
+
+        task_input_result = None
+        try:
+            task_input_result = self._task_worker(i, total_tasks_count, tool, uid, port_config)
+
+            if task_input_result and task_input_result.output:
+                self.logger.info(
+                    f"✅ Task {uid} ({tool}) finished. Final State: {task_input_result.output.state}, Score: {task_input_result.output.score}",
+                    extra=extra_info,
+                )
+
         except Exception as e:
             self.logger.error(f"❌ Task {uid} ({tool}) failed with an unexpected exception: {e}", extra=extra_info)
             if task_input_result is None:
@@ -109,15 +261,27 @@ class Orchestrator:
                     root_dir=self.tasks_root_dir,
                     results_root_dir=self.results_root_dir,
                 )
-            tb_str = traceback.format_exc()
-            _save_error_log(task_input_result, "ORCHESTRATOR_ERROR", e, tb_str)
+            _save_error_log(task_input_result, "ORCHESTRATOR_ERROR", e)
             if not task_input_result.output:
                 task_input_result.output = TaskOutput()
             task_input_result.output.score = 0.0
             task_input_result.output.state = "ORCHESTRATOR_ERROR"
-            task_input_result.save_result_summary()
+            self._save_result_summary(task_input_result)
+        return task_input_result
 
-    def _task_worker(self, task_index: int, total_tasks: int, tool: str, uid: str) -> TaskInput:
+    def _save_result_summary(self, task_input: TaskInput) -> bool:
+        """Saves a worker's summary unless the supervisor already reported the task as timed out."""
+        if (task_input.tool, task_input.uid) in self._timed_out_tasks:
+            self.logger.warning(
+                "Task already reported as timed out; keeping its TIMED_OUT summary.", extra={"task_uid": task_input.uid}
+            )
+            return False
+        task_input.save_result_summary()
+        return True
+
+    def _task_worker(
+        self, task_index: int, total_tasks: int, tool: str, uid: str, port_config: Dict[str, int]
+    ) -> TaskInput:
         """Fully implemented task worker method."""
         self.logger.info(
             _get_divider(
@@ -139,24 +303,25 @@ class Orchestrator:
             )
             self.logger.info("Loaded task definition.", extra={"task_uid": uid})
         except FileNotFoundError as e:
-            tb_str = traceback.format_exc()
-            _save_error_log(task_input, "TASK_DEFINITION_ERROR", e, tb_str)
+            _save_error_log(task_input, "TASK_DEFINITION_ERROR", e)
             self.logger.error("Task definition file not found. Skipping.", extra={"task_uid": uid}, exc_info=False)
             task_input.output.state = "SETUP_ERROR"
             return task_input
 
+        setup_steps, evaluation_step = self._bind_steps(task_input)
+
         agent = None
         try:
-            self.logger.info(f"Assigned ports: {self.port_config}", extra={"task_uid": uid})
+            self.logger.info(f"Assigned ports: {port_config}", extra={"task_uid": uid})
             # FIX: Explicitly map the dictionary keys to the constructor parameters
             # instead of using dictionary unpacking (**).
             sandbox_config = SandboxVMConfig(
                 container_name=uid,
                 shared_dir=task_input.result_dir,
-                host_ssh_port=self.port_config["ssh"],
-                host_vnc_port=self.port_config["vnc"],
-                host_sandbox_fastapi_server_port=self.port_config["fastapi"],
-                host_sandbox_jupyter_kernel_port=self.port_config["jupyter"],
+                host_ssh_port=port_config["ssh"],
+                host_vnc_port=port_config["vnc"],
+                host_sandbox_fastapi_server_port=port_config["fastapi"],
+                host_sandbox_jupyter_kernel_port=port_config["jupyter"],
             )
             self.logger.info(f"Sandbox config created: {sandbox_config.container_name}", extra={"task_uid": uid})
 
@@ -172,28 +337,47 @@ class Orchestrator:
                 return_full_result=True,
                 logger=agent_logger,
             )
+            self._active_agents[tool, uid] = agent
             self.logger.info("Agent initialized.", extra={"task_uid": uid})
-            self._process_task(agent, task_input)
+            self._process_task(agent, task_input, setup_steps, evaluation_step)
         except Exception as e:
-            tb_str = traceback.format_exc()
-            _save_error_log(task_input, "WORKER_ERROR", e, tb_str)
+            _save_error_log(task_input, "WORKER_ERROR", e)
             self.logger.error(f"Worker failed: {e}", extra={"task_uid": uid}, exc_info=False)
             task_input.output.state = "ORCHESTRATOR_ERROR"
         finally:
             if agent:
+                self._active_agents.pop((tool, uid), None)
                 self.logger.info("Cleaning up agent.", extra={"task_uid": uid})
                 agent.cleanup()
 
         self.logger.info(_get_divider(title=f"Worker Finished: {uid[:8]}", char="-"))
         return task_input
 
-    def _process_task(self, agent: SandboxCodeAgent, task_input: TaskInput):
+    def _render_prompt(self, mapping: Dict[str, Any]) -> str:
+        """Fills the pre-parsed prompt template; equivalent to ``agent_prompt_template.format_map(mapping)``."""
+        parts = []
+        for literal, field_name, format_spec, conversion in self._prompt_parts:
+            parts.append(literal)
+            if field_name is not None:
+                value = mapping[field_name]
+                if conversion:
+                    value = repr(value) if conversion == "r" else ascii(value) if conversion == "a" else str(value)
+                parts.append(format(value, format_spec or ""))
+        return "".join(parts)
+
+    def _process_task(
+        self,
+        agent: SandboxCodeAgent,
+        task_input: TaskInput,
+        setup_steps: List[BoundStep],
+        evaluation_step: Optional[BoundStep],
+    ):
         """Fully implemented processing method."""
         self.logger.info(_get_divider(title=f"Processing Task: {task_input.uid[:8]}"))
         try:
-            self._handle_setup(agent, task_input)
+            self._handle_setup(agent, task_input, setup_steps)
             agent_result = agent.run(
-                self.agent_prompt_template.format(complete_task=task_input.prompt, steps=task_input.steps),
+                self._render_prompt({"complete_task": task_input.prompt, "steps": task_input.steps}),
                 max_steps=self.max_agent_steps,
             )
             if isinstance(agent.logger, SandboxAgentLogger):
@@ -202,17 +386,17 @@ class Orchestrator:
 
             task_input.output = TaskOutput(source_result=agent_result)
             self.logger.info(f"Agent finished state: {task_input.output.state}", extra={"task_uid": task_input.uid})
-            self._handle_evaluation(agent, task_input)
+            self._handle_evaluation(agent, task_input, evaluation_step)
         except Exception as e:
-            tb_str = traceback.format_exc()
+            tb_str = "".join(traceback.format_exception(e))
             _save_error_log(task_input, "TASK_EXECUTION_ERROR", e, tb_str)
             self.logger.error(f"Task execution error: {e}", extra={"task_uid": task_input.uid})
             task_input.output = TaskOutput(eval_error=f"Orchestrator error: {e}\n{tb_str}", score=0.0)
         finally:
-            task_input.save_result_summary()
-            self.logger.info(
-                f"Summary saved: {task_input.result_dir / 'summary.json'}", extra={"task_uid": task_input.uid}
-            )
+            if self._save_result_summary(task_input):
+                self.logger.info(
+                    f"Summary saved: {task_input.result_dir / 'summary.json'}", extra={"task_uid": task_input.uid}
+                )
             self._log_summary(task_input)
 
     def _log_summary(self, task_input: TaskInput):
@@ -233,40 +417,64 @@ class Orchestrator:
             self.logger.error("State: ERROR (No output generated)", extra={"task_uid": task_input.uid})
         self.logger.info(_get_divider(char="=", length=60) + "\n")
 
-    def _handle_setup(self, agent: SandboxCodeAgent, task_input: TaskInput):
-        """Handles the 'config' block from the task JSON."""
-        self.logger.info("Executing setup steps...", extra={"task_uid": task_input.uid})
+    def _bind_steps(self, task_input: TaskInput) -> Tuple[List[BoundStep], Optional[BoundStep]]:
+        """
+        Resolves the task's setup and evaluation functions once, before a sandbox is started.
+
+        Unknown setup steps are skipped with a warning, as some task files still carry steps in an older
+        format. An unknown evaluation function is bound to a step that scores the task 0.0 after the agent ran.
+        """
+        setup_steps = []
         for step in task_input.config:
             func_name = step.get("func")
-            arguments = step.get("arguments", {})
-            if func_name and func_name in self.config_dispatch:
-                self.config_dispatch[func_name](agent=agent, task=task_input, **arguments)
+            if func_name in self.config_dispatch:
+                setup_steps.append((self.config_dispatch[func_name], step.get("arguments", {})))
             else:
                 self.logger.warning(f"Unknown setup function: {func_name}", extra={"task_uid": task_input.uid})
 
-    def _handle_evaluation(self, agent: SandboxCodeAgent, task_input: TaskInput):
+        evaluation_step = None
+        func_name = task_input.evaluation.get("func")
+        if func_name:
+            if func_name in self.eval_dispatch:
+                evaluation_step = (self.eval_dispatch[func_name], task_input.evaluation.get("arguments", {}))
+            else:
+                evaluation_step = (functools.partial(self._unknown_evaluation, func_name), {})
+        return setup_steps, evaluation_step
+
+    def _unknown_evaluation(self, func_name: str, agent: SandboxCodeAgent, task: TaskInput) -> float:
+        """Evaluation step for a function missing from ``eval_dispatch``; records the error and scores 0.0."""
+        task.output.eval_error = f"Unknown evaluation function: {func_name}"
+        self.logger.warning(task.output.eval_error, extra={"task_uid": task.uid})
+        return 0.0
+
+    def _handle_setup(self, agent: SandboxCodeAgent, task_input: TaskInput, setup_steps: List[BoundStep]):
+        """Handles the 'config' block from the task JSON."""
+        self.logger.info("Executing setup steps...", extra={"task_uid": task_input.uid})
+        # Runs of consecutive batchable steps (file uploads) are collapsed into one call of their batch
+        # variant; any other step, such as a script that may rely on earlier uploads, runs on its own.
+        for batch_func, group in itertools.groupby(setup_steps, key=lambda step: BATCHED_CONFIG_FUNCS.get(step[0])):
+            steps = list(group)
+            if batch_func is not None and len(steps) > 1:
+                batch_func(agent=agent, task=task_input, files=[arguments for _, arguments in steps])
+            else:
+                for func, arguments in steps:
+                    func(agent=agent, task=task_input, **arguments)
+
+    def _handle_evaluation(self, agent: SandboxCodeAgent, task_input: TaskInput, evaluation_step: Optional[BoundStep]):
         """Handles the 'evaluation' block from the task JSON."""
         self.logger.info("Executing evaluation step...", extra={"task_uid": task_input.uid})
-        eval_config = task_input.evaluation
-        func_name = eval_config.get("func")
-        arguments = eval_config.get("arguments", {})
 
-        if not func_name:
+        if evaluation_step is None:
             self.logger.info("No evaluation function defined. Skipping.", extra={"task_uid": task_input.uid})
             task_input.output.score = -1.0
             return
 
-        if func_name in self.eval_dispatch:
-            try:
-                score = self.eval_dispatch[func_name](agent=agent, task=task_input, **arguments)
-                task_input.output.score = float(score)
-                self.logger.info(f"Evaluation score: {task_input.output.score}", extra={"task_uid": task_input.uid})
-            except Exception as e:
-                tb_str = traceback.format_exc()
-                _save_error_log(task_input, "EVALUATION_ERROR", e, tb_str)
-                task_input.output.score = 0.0
-                task_input.output.eval_error = f"Evaluation failed: {e}"
-        else:
+        func, arguments = evaluation_step
+        try:
+            score = func(agent=agent, task=task_input, **arguments)
+            task_input.output.score = float(score)
+            self.logger.info(f"Evaluation score: {task_input.output.score}", extra={"task_uid": task_input.uid})
+        except Exception as e:
+            _save_error_log(task_input, "EVALUATION_ERROR", e)
             task_input.output.score = 0.0
-            task_input.output.eval_error = f"Unknown evaluation function: {func_name}"
-            self.logger.warning(f"{task_input.output.eval_error}", extra={"task_uid": task_input.uid})
+            task_input.output.eval_error = f"Evaluation failed: {e}"
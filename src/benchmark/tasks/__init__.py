@@ -1,7 +1,7 @@
 # benchmark/__init__.py
 
 # 1. Import the specific functions and classes you need from your submodules.
-from .configuration import upload_file_to_vm, upload_script_and_execute
+from .configuration import upload_file_to_vm, upload_files_to_vm, upload_script_and_execute
 from .eval.general import compare_script_logs, compare_text_file
 from .eval.jupyter import (
     are_jupyter_outputs_cleared,
@@ -20,6 +20,12 @@ CONFIG_DISPATCH = {
     "upload_script_and_execute": upload_script_and_execute,
 }
 
+# Setup functions whose consecutive steps are collapsed into one call of a batch variant, which receives
+# the steps' arguments as a list
+BATCHED_CONFIG_FUNCS = {
+    upload_file_to_vm: upload_files_to_vm,
+}
+
 EVAL_DISPATCH = {
     "compare_csv": compare_csv,
     "compare_script_logs": compare_script_logs,
@@ -35,6 +41,7 @@ EVAL_DISPATCH = {
 
 # This controls what 'from benchmark import *' will import.
 __all__ = [
+    "BATCHED_CONFIG_FUNCS",
     "CONFIG_DISPATCH",
     "EVAL_DISPATCH",
     "TaskInput",
@@ -1,24 +1,15 @@
+import shlex
 from pathlib import Path
-from typing import Union
+from typing import Any, Dict, List, Union
 
 from smolagents import LogLevel
 
-from agent.executor import SandboxExecutor
 from agent.sandbox_agent import SandboxCodeAgent
 from sandbox.configs import SandboxVMConfig
 
 from .task import TaskInput
 
 
-def _get_sandbox_executor(agent: SandboxCodeAgent) -> SandboxExecutor:
-    """Checks and returns the SandboxExecutor from an agent."""
-    if not isinstance(agent.python_executor, SandboxExecutor):
-        msg = "This function requires an agent with a SandboxExecutor."
-        agent.logger.log(msg, level=LogLevel.ERROR)
-        raise TypeError(msg)
-    return agent.python_executor
-
-
 def upload_script_and_execute(
     agent: SandboxCodeAgent,
     task: TaskInput,
@@ -34,7 +25,8 @@ def upload_script_and_execute(
         local_path: Local script path relative to task.task_dir.
         remote_path: Remote directory in the VM to upload and execute in.
     """
-    local_path = (task.task_dir / Path(local_path)).resolve()
+    # SSHClient.put_file resolves the path itself
+    local_path = task.task_dir / local_path
     script_name = local_path.name
     remote_script_path = Path(remote_path) / script_name
 
@@ -42,29 +34,23 @@ def upload_script_and_execute(
         agent.logger.log(f"❌ Local script not found: {local_path}", level=LogLevel.ERROR)
         raise FileNotFoundError(f"{local_path} not found")
 
-    executor = _get_sandbox_executor(agent)
+    executor = agent.get_sandbox_executor()
 
     agent.logger.log(f"📤 Uploading script: {local_path} → {remote_script_path}", level=LogLevel.DEBUG)
     agent.ssh.put_file(local_path, str(remote_script_path))
 
-    if isinstance(executor.vm.cfg, SandboxVMConfig):
-        executor.vm.cfg.runtime_env.update(
-            {
-                "TASK_SETUP_LOG": str(executor.vm.cfg.sandbox_task_setup_log),
-            }
-        )
+    cfg = executor.vm.cfg
+    runtime_env = cfg.runtime_env
+    if isinstance(cfg, SandboxVMConfig):
+        runtime_env["TASK_SETUP_LOG"] = str(cfg.sandbox_task_setup_log)
 
     try:
-        agent.logger.log(f"🔒 chmod +x {remote_script_path}", level=LogLevel.DEBUG)
-        agent.ssh.exec_command(
-            cmd=f"chmod +x {remote_script_path}",
-            as_root=True,
-        )
-
+        # One channel for both steps. The script was uploaded by the SSH user, so it can chmod it without
+        # root; going through sh -c keeps the env prefix applied to the script itself, not just chmod.
         agent.logger.log(f"🚀 Executing {remote_script_path}", level=LogLevel.DEBUG)
         result = agent.ssh.exec_command(
-            cmd=str(remote_script_path),
-            env=executor.vm.cfg.runtime_env,
+            cmd=f'sh -c \'chmod +x "$0" && exec "$0"\' {shlex.quote(str(remote_script_path))}',
+            env=runtime_env,
         )
 
         if result and result.get("stderr"):
@@ -80,11 +66,23 @@ def upload_script_and_execute(
 def upload_file_to_vm(
     agent: SandboxCodeAgent, task: TaskInput, local_path: Union[str, Path], remote_path: Union[str, Path]
 ):
-    local_path = (task.task_dir / Path(local_path)).resolve()
+    local_path = task.task_dir / local_path
     agent.logger.log(f"📤 Uploading file to VM: {local_path} → {remote_path}")
     agent.ssh.put_file(local_path, str(remote_path))
 
 
+def upload_files_to_vm(agent: SandboxCodeAgent, task: TaskInput, files: List[Dict[str, Any]]):
+    """
+    Uploads several files in one batch; each entry holds the arguments of an ``upload_file_to_vm`` step.
+    """
+    pairs = []
+    for file in files:
+        local_path = task.task_dir / file["local_path"]
+        agent.logger.log(f"📤 Uploading file to VM: {local_path} → {file['remote_path']}")
+        pairs.append((local_path, str(file["remote_path"])))
+    agent.ssh.put_files(pairs)
+
+
 def download_file_from_vm(
     agent: SandboxCodeAgent,
     local_path: Union[str, Path],
@@ -98,8 +96,6 @@ def download_file_from_vm(
     local_path_obj = Path(local_path).resolve()
     remote_path_str = str(remote_path)
 
-    local_path_obj.parent.mkdir(parents=True, exist_ok=True)
-
     agent.logger.log(
         f"📥 Downloading file from VM: '{remote_path_str}' to '{local_path_obj}' (overwrite={overwrite})",
     )
@@ -114,7 +110,7 @@ def download_file_from_vm(
             remote=remote_path_str,
             local=local_path_obj,
             overwrite=overwrite,
-            mkdir_parents=False,
+            mkdir_parents=True,  # created only once the remote file is known to exist
         )
     except AttributeError:
         raise
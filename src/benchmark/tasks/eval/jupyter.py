@@ -3,7 +3,6 @@ import shutil
 from pathlib import Path
 from typing import Any, Dict, List
 
-import cv2
 import nbformat
 from smolagents import LogLevel
 
@@ -314,6 +313,9 @@ def compare_jupyterlab_images(
             return 0.0
         shutil.copy2(source_expected_file_path, local_expected_reference_path)
 
+        # OpenCV is only needed by this evaluator; keep it off the import path of every other task
+        import cv2
+
         # Load images
         img1 = cv2.imread(str(local_expected_reference_path))
         img2 = cv2.imread(str(local_vm_result_path))
@@ -454,6 +456,13 @@ def evaluate_multiple_notebooks(
         )
         return 0.0
 
+    op = operator.lower()
+    if op not in ("and", "or"):
+        agent.logger.log(
+            f"❗ Invalid operator '{operator}'. Expected 'and' or 'or'. Returning 0.0.", level=LogLevel.ERROR
+        )
+        return 0.0
+
     sub_scores = []
     agent.logger.log(
         f"Starting multiple notebook evaluation for task '{task.uid}' with operator: '{operator.upper()}'",
@@ -476,28 +485,34 @@ def evaluate_multiple_notebooks(
                 f"❌ Unknown or missing comparison function: '{comp_func_name}'. Skipping comparison {i + 1}.",
                 level=LogLevel.ERROR,
             )
-            sub_scores.append(0.0)
-            continue
-
-        try:
-            score = comp_func(agent=agent, task=task, **comp_arguments)
-            sub_scores.append(score)
-            agent.logger.log(f"Sub-comparison {i + 1} ('{comp_func_name}') result: {score}", level=LogLevel.INFO)
-        except Exception as e:
-            agent.logger.log(f"❌ Error during sub-comparison {i + 1} ('{comp_func_name}'): {e}", level=LogLevel.ERROR)
-            sub_scores.append(0.0)
-
-    final_score = 0.0
-    if operator.lower() == "and":
+            score = 0.0
+        else:
+            try:
+                score = comp_func(agent=agent, task=task, **comp_arguments)
+                agent.logger.log(f"Sub-comparison {i + 1} ('{comp_func_name}') result: {score}", level=LogLevel.INFO)
+            except Exception as e:
+                agent.logger.log(
+                    f"❌ Error during sub-comparison {i + 1} ('{comp_func_name}'): {e}", level=LogLevel.ERROR
+                )
+                score = 0.0
+        sub_scores.append(score)
+
+        # The outcome is decided as soon as one sub-score fails an AND or passes an OR;
+        # the remaining comparisons would only download and parse more notebooks.
+        if (op == "and") != (score == 1.0):
+            skipped = len(comparisons) - i - 1
+            if skipped:
+                agent.logger.log(
+                    f"Short-circuiting '{op.upper()}' after comparison {i + 1}; skipping {skipped} remaining.",
+                    level=LogLevel.INFO,
+                )
+            break
+
+    if op == "and":
         final_score = 1.0 if all(s == 1.0 for s in sub_scores) else 0.0
-        agent.logger.log(f"Aggregation using 'AND' ({sub_scores}): Final Score = {final_score}", level=LogLevel.INFO)
-    elif operator.lower() == "or":
-        final_score = 1.0 if any(s == 1.0 for s in sub_scores) else 0.0
-        agent.logger.log(f"Aggregation using 'OR' ({sub_scores}): Final Score = {final_score}", level=LogLevel.INFO)
     else:
-        agent.logger.log(
-            f"❗ Invalid operator '{operator}'. Expected 'and' or 'or'. Returning 0.0.", level=LogLevel.ERROR
-        )
-        final_score = 0.0
-
+        final_score = 1.0 if any(s == 1.0 for s in sub_scores) else 0.0
+    agent.logger.log(
+        f"Aggregation using '{op.upper()}' ({sub_scores}): Final Score = {final_score}", level=LogLevel.INFO
+    )
     return final_score
@@ -1,7 +1,6 @@
 import shutil
 from pathlib import Path
 
-import pandas as pd
 from smolagents import LogLevel
 
 from agent.sandbox_agent import SandboxCodeAgent
@@ -10,6 +9,20 @@ from ...tasks.configuration import download_file_from_vm
 from ..task import TaskInput
 
 
+def _normalize_str_columns(df, method: str):
+    """Applies a ``.str`` method (e.g. ``"strip"``) to the string cells of every text column.
+
+    Uses the vectorized ``.str`` accessor instead of a per-cell Python lambda; cells that are not
+    strings come back as NaN from ``.str`` and are restored from the original column.
+    """
+    df = df.copy()
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        original = df[col]
+        normalized = getattr(original.str, method)()
+        df[col] = normalized.where(normalized.notna(), original)
+    return df
+
+
 def compare_csv(
     agent: SandboxCodeAgent,
     task: TaskInput,
@@ -50,6 +63,9 @@ def compare_csv(
             return 0.0
         shutil.copy2(source_expected_file_path, local_expected_reference_path)
 
+        # pandas is only needed by this evaluator; keep it off the import path of every other task
+        import pandas as pd
+
         # Read CSVs into pandas DataFrames
         df_result = pd.read_csv(local_vm_result_path)
         df_expected = pd.read_csv(local_expected_reference_path)
@@ -68,12 +84,12 @@ def compare_csv(
 
     # Process options
     if not options.get("strict", True):
-        df_result = df_result.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-        df_expected = df_expected.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+        df_result = _normalize_str_columns(df_result, "strip")
+        df_expected = _normalize_str_columns(df_expected, "strip")
 
     if options.get("ignore_case", False):
-        df_result = df_result.applymap(lambda x: x.lower() if isinstance(x, str) else x)
-        df_expected = df_expected.applymap(lambda x: x.lower() if isinstance(x, str) else x)
+        df_result = _normalize_str_columns(df_result, "lower")
+        df_expected = _normalize_str_columns(df_expected, "lower")
 
     # To ignore row order, we sort the entire DataFrame by all columns
     if options.get("ignore_order", False):
@@ -1,8 +1,8 @@
-import json
 from dataclasses import InitVar, asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
+import orjson
 from smolagents import RunResult
 
 
@@ -91,7 +91,7 @@ class TaskInput:
         """Factory method to load a task specification from a JSON file."""
         task_dir = root / tool / uid
         meta_path = task_dir / f"{uid}.json"
-        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta = orjson.loads(meta_path.read_bytes())
 
         return cls(
             uid=uid,
@@ -125,4 +125,6 @@ class TaskInput:
 
         # 4. Save the dictionary
         summary_path = self.result_dir / "summary.json"
-        summary_path.write_text(json.dumps(summary_data, indent=2, default=str), encoding="utf-8")
+        summary_path.write_bytes(
+            orjson.dumps(summary_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+        )
@@ -1,6 +1,8 @@
 import json
 import signal
 import sys
+import threading
+import traceback
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
@@ -9,32 +11,45 @@ from agent import LogColors  # Assuming this is where your color definitions are
 from benchmark.tasks import TaskInput  # Assuming TaskInput is in this module
 
 
-# Timeout class remains the same
 class Timeout:
     """
     Context manager to enforce a timeout on a block of code using signals.
     NOTE: This will not work on Windows, as `signal.alarm` is not available.
+    Signals are only delivered to the main thread, so outside it this is a no-op.
+
+    Unlike an interrupt between agent steps, the signal also aborts a blocking socket read or a long
+    SSH command. The raised TimeoutError may be swallowed by a broad ``except`` inside the block, so
+    ``timed_out`` records whether the alarm fired.
     """
 
     def __init__(self, seconds=1, error_message="Timeout after {} seconds".format):
         self.seconds = seconds
         self.error_message = error_message(seconds)
+        self.enabled = sys.platform != "win32" and threading.current_thread() is threading.main_thread()
+        self.timed_out = False
 
     def _handle_timeout(self, signum, frame):
+        self.timed_out = True
         raise TimeoutError(self.error_message)
 
     def __enter__(self):
-        if sys.platform != "win32":
+        if self.enabled:
             signal.signal(signal.SIGALRM, self._handle_timeout)
             signal.alarm(self.seconds)
+        return self
 
     def __exit__(self, type, value, traceback):
-        if sys.platform != "win32":
+        if self.enabled:
             signal.alarm(0)
 
 
-def _save_error_log(task_input: TaskInput, error_type: str, exception: Exception, tb_str: str) -> Path:
-    """Helper function to save detailed error logs to a file."""
+def _save_error_log(
+    task_input: TaskInput, error_type: str, exception: BaseException, tb_str: Optional[str] = None
+) -> Path:
+    """Helper function to save detailed error logs to a file.
+
+    The traceback is formatted from *exception* itself unless the caller already has it as *tb_str*.
+    """
     error_log_dir = task_input.result_dir / "logs"
     error_log_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -46,7 +61,7 @@ def _save_error_log(task_input: TaskInput, error_type: str, exception: Exception
     content += f"Task UID: {task_input.uid}\n"
     content += f"Exception: {exception}\n\n"
     content += "Traceback:\n"
-    content += tb_str
+    content += tb_str if tb_str is not None else "".join(traceback.format_exception(exception))
 
     error_log_path.write_text(content, encoding="utf-8")
     return error_log_path
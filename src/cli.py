@@ -79,6 +79,9 @@ def main():
     # Orchestrator tuning
     parser.add_argument("--task-timeout", type=int, default=TASK_TIMEOUT_SECONDS, help="Timeout per task.")
     parser.add_argument("--max-agent-steps", type=int, default=15, help="Max steps per agent run.")
+    parser.add_argument(
+        "--max-parallel-tasks", type=int, default=1, help="Number of tasks (sandbox VMs) to run concurrently."
+    )
 
     args = parser.parse_args()
 
@@ -93,17 +96,18 @@ def main():
         agent_prompt = load_prompt_from_file(args.prompt_file, args.prompt_key)
         orchestrator_logger.info(f"Loaded prompt '{args.prompt_key}' from {args.prompt_file}")
 
-        port_config = generate_port_pool(START_PORT, 1, PORT_KEYS)[0]
+        port_pool = generate_port_pool(START_PORT, args.max_parallel_tasks, PORT_KEYS)
 
         runner = Orchestrator(
             model=model,
             tasks_root_dir=args.tasks_root,
             results_root_dir=args.results_root,
             logger=orchestrator_logger,
-            port_config=port_config,
+            port_config=port_pool,
             agent_prompt_template=agent_prompt,
             task_timeout=args.task_timeout,
             max_agent_steps=args.max_agent_steps,
+            max_parallel_tasks=args.max_parallel_tasks,
         )
         runner.run_benchmark(task_index_path=args.task_index)
 
@@ -12,7 +12,6 @@ import pyautogui
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 from PIL import Image, ImageDraw, ImageFont, ImageGrab
-import numpy as np
 from src.pyxcursor import Xcursor
 from src.recording import (
     recorded_actions,
@@ -146,16 +145,15 @@ def take_screenshot(method: Literal["pyautogui", "pillow"] = "pillow", step: Opt
         else:
             filepath = screenshot_dir / filename
 
+        # Grab straight into memory; the annotated frame below is the only PNG we encode.
         if method == "pyautogui":
-            pyautogui.screenshot(imageFilename=str(filepath))
-            img = Image.open(filepath)
+            img = pyautogui.screenshot()
         elif method == "pillow":
             img = ImageGrab.grab()
         else:
             raise ValueError(f"Unknown screenshot method: {method}")
 
-        arr = np.array(img)
-        screenshot_img = Image.fromarray(arr)
+        screenshot_img = img if img.mode == "RGB" else img.convert("RGB")
         draw = ImageDraw.Draw(screenshot_img)
 
         mouse_x, mouse_y = pyautogui.position()
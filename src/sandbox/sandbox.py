@@ -20,30 +20,42 @@ class SandboxClient:
         self.base_url = f"http://{host}:{port}"
         self.retries = retries
         self.delay = delay
+        # One pooled keep-alive connection for the health/screenshot/record calls of a whole run
+        self._session = requests.Session()
 
         print(f"Attempting to connect to Sandbox server at {self.base_url}...")
-        for attempt in range(1, self.retries + 1):
+        # Same overall budget as retries × delay, but poll quickly at first so a server that is
+        # already up (e.g. on reconnect) is picked up without waiting a full delay.
+        deadline = time.monotonic() + self.retries * self.delay
+        interval = 0.25
+        attempt = 0
+        while True:
+            attempt += 1
             try:
                 health_status = self.health()
                 if health_status.get("status") == "ok":
                     print(f"Sandbox server initialized and healthy after {attempt} attempts.")
                     return  # Successfully connected, exit init
                 else:
-                    print(f"Attempt {attempt}/{self.retries}: Server not healthy, status: {health_status}. Retrying...")
+                    print(f"Attempt {attempt}: Server not healthy, status: {health_status}. Retrying...")
             except requests.exceptions.ConnectionError as e:
                 print(
-                    f"Attempt {attempt}/{self.retries}: Connection error to {self.base_url}: {e}. Retrying in {self.delay} seconds..."
+                    f"Attempt {attempt}: Connection error to {self.base_url}: {e}. Retrying in {interval:.2f} seconds..."
                 )
             except Exception as e:
                 print(
-                    f"Attempt {attempt}/{self.retries}: An unexpected error occurred during health check: {e}. Retrying in {self.delay} seconds..."
+                    f"Attempt {attempt}: An unexpected error occurred during health check: {e}. Retrying in {interval:.2f} seconds..."
                 )
-            time.sleep(self.delay)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.delay)
 
-        raise ConnectionError(f"Failed to connect to sandbox server at {self.base_url} after {self.retries} attempts.")
+        raise ConnectionError(f"Failed to connect to sandbox server at {self.base_url} after {attempt} attempts.")
 
     def health(self):
-        return requests.get(f"{self.base_url}/health").json()
+        return self._session.get(f"{self.base_url}/health").json()
 
     def take_screenshot(self, method: str = "pillow", step: Optional[str] = None):
         """
@@ -56,15 +68,18 @@ class SandboxClient:
             # Inside this block, `step` is guaranteed to be a string.
             params["step"] = step
 
-        response = requests.get(f"{self.base_url}/screenshot", params=params)
+        response = self._session.get(f"{self.base_url}/screenshot", params=params)
         response.raise_for_status()
         return response.json()
 
     def start_recording(self):
-        return requests.get(f"{self.base_url}/record", params={"mode": "start"}).json()
+        return self._session.get(f"{self.base_url}/record", params={"mode": "start"}).json()
 
     def stop_recording(self):
-        return requests.get(f"{self.base_url}/record", params={"mode": "stop"}).json()
+        return self._session.get(f"{self.base_url}/record", params={"mode": "stop"}).json()
+
+    def close(self):
+        self._session.close()
 
 
 class SandboxVMManager(VMManager):
@@ -129,10 +144,18 @@ class SandboxVMManager(VMManager):
         self.cleanup(delete_storage=delete_storage)
         return False
 
+    def cleanup(self, delete_storage: bool = True):
+        sandbox_client = getattr(self, "sandbox_client", None)
+        if sandbox_client is not None:
+            sandbox_client.close()
+        super().cleanup(delete_storage=delete_storage)
+
     def mount_shared_dir(self):
         """Mounts the shared volume inside the guest."""
-        self.ssh.exec_command("mkdir -p /mnt/container", as_root=True)
-        self.ssh.exec_command("mount -t 9p -o trans=virtio shared /mnt/container", as_root=True)
+        # One sudo round-trip: both steps need root and each exec pays for a channel, PTY and password prompt
+        self.ssh.exec_command(
+            "sh -c 'mkdir -p /mnt/container && mount -t 9p -o trans=virtio shared /mnt/container'", as_root=True
+        )
 
     def _initialize_sandbox_client(self):
         """Helper to initialize SandboxClient and handle related errors."""
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import os
 import posixpath
+import queue
 import shlex
+import socket
 import stat  # Added for file type checks
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import paramiko
 from smolagents import AgentLogger, LogLevel
@@ -28,13 +32,16 @@ class SSHConfig:
     key_filename: Optional[str] = None
     connect_timeout: int = 60
     command_timeout: int = 180
-    initial_delay: int = 15
+    initial_delay: int = 15  # upper bound on waiting for the server banner before connecting
     banner_timeout: int = 10
     keepalive: int = 10
 
 
 PathLike = str | os.PathLike[str]
 
+# Matched against a lowercased sliding tail of the output, so it must stay lowercase
+_SUDO_PROMPT = "[sudo] password for"
+
 
 # ────────────────────────────────────────────────────────────────────
 # Helpers
@@ -49,7 +56,10 @@ def _mkdir_p(sftp: paramiko.SFTPClient, remote_dir: str, logger: AgentLogger | N
         _mkdir_p(sftp, parent, logger)
         if logger:
             logger.log(f"Creating remote dir: {remote_dir}", level=LogLevel.DEBUG)
-        sftp.mkdir(remote_dir)
+        try:
+            sftp.mkdir(remote_dir)
+        except IOError:
+            sftp.stat(remote_dir)  # created concurrently by another upload; re-raise only if still missing
 
 
 # ────────────────────────────────────────────────────────────────────
@@ -62,7 +72,11 @@ class SSHClient:
         self.cfg = cfg
         self.logger = logger or AgentLogger(level=LogLevel.DEBUG)
         self._client: Optional[paramiko.SSHClient] = None
-        self._sftp: Optional[paramiko.SFTPClient] = None
+        # One SFTP session per thread: paramiko's SFTPClient is not meant to be shared between threads, while
+        # several sessions can share one transport. All sessions are tracked so close() can shut them down.
+        self._sftp_local = threading.local()
+        self._sftp_sessions: List[paramiko.SFTPClient] = []
+        self._sftp_lock = threading.Lock()
 
     def __enter__(self):
         self.connect()
@@ -97,29 +111,67 @@ class SSHClient:
         if self._client and transport and transport.is_active():
             return self._client
         if self.cfg.initial_delay:
-            self.logger.log(f"Initial delay {self.cfg.initial_delay}s before connect", level=LogLevel.DEBUG)
-            time.sleep(self.cfg.initial_delay)
+            self._wait_for_banner(self.cfg.initial_delay)
         try:
             self._client = self._establish()
         except Exception as exc:
             raise SSHError(f"SSH connection failed: {exc!r}") from exc
         return self._client
 
+    def _wait_for_banner(self, timeout: float, interval: float = 0.25) -> bool:
+        """Poll until the server sends its ``SSH-`` identification banner, at most *timeout* seconds.
+
+        A published docker port accepts TCP connections before sshd in the guest is up, so
+        only the banner tells us the handshake can succeed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.log(f"No SSH banner within {timeout}s, connecting anyway", level=LogLevel.DEBUG)
+                return False
+            try:
+                with socket.create_connection((self.cfg.hostname, self.cfg.port), timeout=remaining) as sock:
+                    sock.settimeout(min(remaining, self.cfg.banner_timeout))
+                    if sock.recv(4).startswith(b"SSH-"):
+                        return True
+            except OSError:
+                pass
+            time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+
     def close(self) -> None:
-        if self._sftp:
-            self._sftp.close()
-            self._sftp = None
+        with self._sftp_lock:
+            sessions, self._sftp_sessions = self._sftp_sessions, []
+        for sftp in sessions:
+            sftp.close()
+        self._sftp_local = threading.local()
         if self._client:
             self._client.close()
             self._client = None
         self.logger.log("SSH connection closed", level=LogLevel.DEBUG)
 
     def _get_sftp(self) -> paramiko.SFTPClient:
+        """Returns the calling thread's SFTP session, opening one if needed."""
         # FIX: Check transport and its status safely
         transport = self._client.get_transport() if self._client else None
-        if not self._sftp or not (self._client and transport and transport.is_active()):
-            self._sftp = self.connect().open_sftp()
-        return self._sftp
+        sftp = getattr(self._sftp_local, "sftp", None)
+        if not sftp or not (self._client and transport and transport.is_active()):
+            with self._sftp_lock:  # connect() must not race to replace the client
+                sftp = self.connect().open_sftp()
+                self._sftp_sessions.append(sftp)
+            self._sftp_local.sftp = sftp
+        return sftp
+
+    def _release_sftp(self) -> None:
+        """Closes the calling thread's SFTP session, if it has one."""
+        sftp = getattr(self._sftp_local, "sftp", None)
+        if sftp is None:
+            return
+        self._sftp_local.sftp = None
+        with self._sftp_lock:
+            if sftp in self._sftp_sessions:
+                self._sftp_sessions.remove(sftp)
+        sftp.close()
 
     def exec_command(
         self,
@@ -132,6 +184,8 @@ class SSHClient:
         use_command_prefix_for_env: bool = True,
     ) -> Dict[str, Any] | None:
         original_cmd_for_logging = cmd
+        # AgentLogger.log filters by level only after the message is built; skip building debug text up front
+        debug = self.logger.level >= LogLevel.DEBUG
         env_prefix = ""
         if env and use_command_prefix_for_env:
             env_prefix_parts = []
@@ -145,10 +199,11 @@ class SSHClient:
                 env_prefix_parts.append(f"{k}={shlex.quote(str(v_val))}")
             if env_prefix_parts:
                 env_prefix = " ".join(env_prefix_parts) + " "
-            self.logger.log(
-                f"Using command prefix for environment variables: {env_prefix.strip()}", level=LogLevel.DEBUG
-            )
-        elif env and not use_command_prefix_for_env:
+            if debug:
+                self.logger.log(
+                    f"Using command prefix for environment variables: {env_prefix.strip()}", level=LogLevel.DEBUG
+                )
+        elif env and not use_command_prefix_for_env and debug:
             self.logger.log(
                 "Attempting to use channel.update_environment for SSH session environment vars:",
                 level=LogLevel.DEBUG,
@@ -161,7 +216,8 @@ class SSHClient:
         if as_root and not cmd_to_execute.strip().startswith("sudo"):
             cmd_to_execute = f"sudo -S {cmd_to_execute}"
 
-        self.logger.log(f"✨ ssh $ {cmd_to_execute}", level=LogLevel.DEBUG)
+        if debug:
+            self.logger.log(f"✨ ssh $ {cmd_to_execute}", level=LogLevel.DEBUG)
         ssh_conn = self.connect()
 
         transport = ssh_conn.get_transport()
@@ -198,16 +254,19 @@ class SSHClient:
         read_buffer = ""
 
         while not exit_status_ready and (time.time() - start_time < self.cfg.command_timeout):
+            watch_prompt = needs_pty and not password_sent
             if channel.recv_ready():
                 data = channel.recv(4096).decode(errors="ignore")
                 stdout_data_parts.append(data)
-                read_buffer += data
+                if watch_prompt:
+                    read_buffer = read_buffer[-len(_SUDO_PROMPT) :] + data.lower()
             if channel.recv_stderr_ready():
                 data = channel.recv_stderr(4096).decode(errors="ignore")
                 stderr_data_parts.append(data)
-                read_buffer += data
+                if watch_prompt:
+                    read_buffer = read_buffer[-len(_SUDO_PROMPT) :] + data.lower()
 
-            if needs_pty and not password_sent and "[sudo] password for" in read_buffer.lower():
+            if watch_prompt and _SUDO_PROMPT in read_buffer:
                 self.logger.log("Sudo password prompt DETECTED. Attempting to send password...", level=LogLevel.DEBUG)
                 if password_to_send:
                     try:
@@ -266,7 +325,7 @@ class SSHClient:
                 log_message += f"\nStdout:\n{out_final.strip()}"
             self.logger.log(log_message, level=LogLevel.ERROR)
             raise RemoteCommandError(original_cmd_for_logging, status, out_final, err_final)
-        elif self.logger.level <= LogLevel.DEBUG:
+        elif self.logger.level >= LogLevel.DEBUG:
             if out_final:
                 self.logger.log(
                     f"Command {original_cmd_for_logging!r} stdout:\n{out_final.strip()}", level=LogLevel.DEBUG
@@ -320,6 +379,60 @@ class SSHClient:
             self.logger.log_error(f"Failed to upload {local_path} to {remote_path}: {e}")
             raise VMOperationError(f"Failed to upload file via SFTP: {e}") from e
 
+    def put_files(
+        self,
+        pairs: Sequence[Tuple[PathLike, PathLike]],
+        *,
+        mkdir_parents: bool = True,
+        overwrite: bool = True,
+        max_workers: int = 4,
+    ) -> None:
+        """Uploads several ``(local, remote)`` files over concurrent SFTP sessions on the one connection."""
+        if mkdir_parents:
+            # Create each remote parent once up front instead of stat-walking it for every file
+            sftp = self._get_sftp()
+            for remote_dir in dict.fromkeys(posixpath.dirname(posixpath.normpath(str(remote))) for _, remote in pairs):
+                _mkdir_p(sftp, remote_dir, self.logger)
+
+        if len(pairs) <= 1 or max_workers <= 1:
+            for local, remote in pairs:
+                self.put_file(local, remote, mkdir_parents=False, overwrite=overwrite)
+            return
+
+        # A fixed set of workers drains a shared queue, each over its own SFTP session that is closed again
+        # when it is done, so repeated batches don't pile up channels on the transport
+        pending: "queue.SimpleQueue[Tuple[PathLike, PathLike]]" = queue.SimpleQueue()
+        for pair in pairs:
+            pending.put(pair)
+        # Set by the first failing upload so the other workers stop taking files, like the sequential loop
+        failed = threading.Event()
+        workers = min(max_workers, len(pairs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sftp") as pool:
+            futures = [pool.submit(self._put_files_worker, pending, failed, overwrite) for _ in range(workers)]
+            for future in as_completed(futures):
+                future.result()
+
+    def _put_files_worker(
+        self,
+        pending: "queue.SimpleQueue[Tuple[PathLike, PathLike]]",
+        failed: threading.Event,
+        overwrite: bool,
+    ) -> None:
+        """Uploads files from *pending* until it is empty or an upload failed, then closes this thread's SFTP session."""
+        try:
+            while not failed.is_set():
+                try:
+                    local, remote = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self.put_file(local, remote, mkdir_parents=False, overwrite=overwrite)
+                except BaseException:
+                    failed.set()
+                    raise
+        finally:
+            self._release_sftp()
+
     def put_directory(
         self,
         local: PathLike,
@@ -147,12 +147,14 @@ class VMManager:
     # ------------------------------------------------------------------
     # SSH readiness -----------------------------------------------------
     # ------------------------------------------------------------------
-    def _wait_for_ssh_ready(self, timeout: float = 300, interval: float = 5.0):
+    def _wait_for_ssh_ready(self, timeout: float = 300, interval: float = 5.0, initial_interval: float = 0.5):
+        """Poll sshd until it answers, backing off exponentially from *initial_interval* up to *interval*."""
         self.logger.log_rule("🔐 SSH Initialization")
         host, port = self.ssh.cfg.hostname, self.ssh.cfg.port
         self.logger.log(f"🔍 Waiting for sshd on {host}:{port}…", level=LogLevel.INFO)
-        deadline = time.time() + timeout
-        while time.time() < deadline:
+        deadline = time.monotonic() + timeout
+        delay = min(initial_interval, interval)
+        while time.monotonic() < deadline:
             try:
                 # FIX 1: Check if the result is not None before subscripting
                 result = self.ssh.exec_command("echo ready")
@@ -161,7 +163,8 @@ class VMManager:
                     return
             except Exception as exc:
                 self.logger.log(f"⏳ ssh probe failed: {exc}", level=LogLevel.DEBUG)
-            time.sleep(interval)
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, interval)
         raise TimeoutError(f"sshd not reachable within {timeout}s")
 
     # ------------------------------------------------------------------